@@ -1,11 +1,20 @@
 #!/usr/bin/env python
 """Entry point for pynote."""
 import argparse
+from pathlib import Path
 from libs.interface import UI, Settings, CLI, State, WindowTemplates
 
 parser = argparse.ArgumentParser(description="pynote")
 parser.add_argument("-d", "--directory", help="Directory to list")
 parser.add_argument("-n", "--notes", action="store_true", help="List notes")
+parser.add_argument(
+    "-i", "--import", dest="import_dir", help="Import a Markdown/text archive"
+)
+parser.add_argument("-v", "--view", help="View a file read-only")
+parser.add_argument("-s", "--snapshot", help="Write an incremental wiki snapshot")
+parser.add_argument(
+    "-r", "--restore", nargs="+", help="Apply snapshot archives to the wiki"
+)
 args = parser.parse_args()
 settings = Settings()
 state: State = State(settings=settings, layout=WindowTemplates.home(UI()))
@@ -14,7 +23,17 @@ state: State = State(settings=settings, layout=WindowTemplates.home(UI()))
 if __name__ == "__main__":
     if args.directory:
         print(CLI().dir_search(args.directory))
-    if args.notes:
+    if args.import_dir:
+        CLI().wiki_import(args.import_dir)
+    elif args.snapshot:
+        CLI().wiki_snapshot(args.snapshot)
+    elif args.restore:
+        CLI().wiki_restore(args.restore)
+    elif args.notes:
         CLI().wiki_capture()
+    elif args.view:
+        ui = UI()
+        ui.state.layout = WindowTemplates.viewer(ui, Path(args.view))
+        ui.run(ui.state)
     else:
         UI().run(state)
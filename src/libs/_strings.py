@@ -9,3 +9,4 @@ class PStrings:
     menu_help: HTML = HTML("<p1>F1: 󰋖 Help</p1>")
     menu_options: HTML = HTML("<p1>F2:  Options</p1>")
     menu_notes: HTML = HTML("<p1>C-n:  Notes</p1>")
+    menu_view: HTML = HTML("<p1>C-o: 󰈈 View</p1>")
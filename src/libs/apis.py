@@ -1,14 +1,17 @@
 """Define interfaces for pynote."""
 
 import os
+import queue
 import subprocess
 import tempfile
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from shutil import which
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from prompt_toolkit import Application
 from prompt_toolkit import print_formatted_text as print
@@ -25,6 +28,8 @@ from prompt_toolkit.shortcuts import prompt
 from prompt_toolkit.styles import Style
 from pygments.lexers.html import HtmlLexer
 
+from .frecency import Frecency
+
 # from .interface import PStrings, Settings, Status
 
 executor = ThreadPoolExecutor(max_workers=1)
@@ -41,22 +46,40 @@ class FzF:
             self.path: str = "fzf"
 
     def prompt(
-        self, choices: List, opts: Optional[str] = "", delimiter: str = "\n"
+        self, choices: Iterable, opts: Optional[str] = "", delimiter: str = "\n"
     ) -> List:
+        """Stream `choices` to fzf as they are produced and return the selection"""
         selection: List = []
-        choices_str: str = delimiter.join(map(str, choices))
-        with tempfile.NamedTemporaryFile(delete=False) as input_file:
-            with tempfile.NamedTemporaryFile(delete=False) as output_file:
-                input_file.write(choices_str.encode("utf-8"))
-                input_file.flush()
+        with tempfile.NamedTemporaryFile(delete=False) as output_file:
+            pass
+
+        proc = subprocess.Popen(
+            f'{self.path} {opts} > "{output_file.name}"',
+            shell=True,
+            stdin=subprocess.PIPE,
+            bufsize=0,
+        )
 
-        os.system(f'{self.path} {opts} < "{input_file.name}" > "{output_file.name}"')
+        def feed():
+            try:
+                for choice in choices:
+                    proc.stdin.write(f"{choice}{delimiter}".encode("utf-8"))
+                proc.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+            finally:
+                if hasattr(choices, "close"):
+                    choices.close()
+
+        # fzf may exit while `choices` is still blocked producing the next
+        # entry, so feed it from a daemon thread and only wait on fzf itself.
+        threading.Thread(target=feed, daemon=True).start()
+        proc.wait()
 
         with open(output_file.name, encoding="utf-8") as f:
             for line in f:
                 selection.append(line.strip("\n"))
 
-        os.unlink(input_file.name)
         os.unlink(output_file.name)
 
         return selection
@@ -79,13 +102,20 @@ class tkList:
 @dataclass
 class DirectoryList(tkList):
     path: Path
+    history: Optional[Frecency]
 
-    def __init__(self, path: str = "."):
+    def __init__(self, path: str = ".", history: Optional[Frecency] = None):
         self.path = Path(path).expanduser()
-        self.obj = self.get_list()
+        self.history = history
+
+    @property
+    def obj(self) -> List:
+        return self.get_list()
 
     def get_list(self, d=None) -> List:
-        _list = []
+        return list(self.iter_list(d))
+
+    def iter_list(self, d=None) -> Iterator[str]:
         if d != None:
             path = Path(d)
         else:
@@ -93,12 +123,37 @@ class DirectoryList(tkList):
 
         for i in path.iterdir():
             if i.is_dir():
-                for _i in self.get_list(i):
-                    _list.append(f"{path.name}/{i.name}/{_i}")
+                for _i in self.iter_list(i):
+                    yield f"{path.name}/{_i}"
             else:
-                _list.append(f"{path.name}/{i.name}")
+                yield f"{path.name}/{i.name}"
+
+    def entry_path(self, entry: str) -> Path:
+        """Map a listing entry back to its absolute path"""
+        return self.path.resolve().joinpath(*Path(entry).parts[1:])
+
+    def entry_name(self, file_path: Path) -> str:
+        """Map an absolute path to its listing entry"""
+        return f"{self.path.name}/{file_path.relative_to(self.path.resolve())}"
+
+    def ranked_list(self) -> Iterator[str]:
+        """Yield frecent entries first, then the rest in filesystem order"""
+        seen = set()
+        if self.history is not None:
+            for file_path, _ in self.history.ranked(self.path):
+                if file_path.is_file():
+                    entry = self.entry_name(file_path)
+                    seen.add(entry)
+                    yield entry
+        for entry in self.iter_list():
+            if entry not in seen:
+                yield entry
+
+    def picker(self):
+        return FzF().prompt(self.ranked_list())
 
-        return _list
+    def pick_or_return_input(self, opts: Optional[str] = ""):
+        return FzF().prompt(choices=self.ranked_list(), opts=opts)
 
 
 @dataclass
@@ -129,6 +184,7 @@ class Notebook:
         Holds notebook data
     Attributes:
         path (Path): Notebook Path
+        name (str): Notebook Name, defaults to the directory name
         notes (List): List of Notes
     Example:
         >>> example_function_call()
@@ -136,15 +192,150 @@ class Notebook:
     """
 
     path: Path
+    name: str
     dir_list: DirectoryList
     notes: Optional[List[Note]]
 
-    def __init__(self, path: Path):
-        self.path = path
-        self.dir_list = DirectoryList(self.path.name)
+    def __init__(
+        self,
+        path: Path,
+        name: Optional[str] = None,
+        history: Optional[Frecency] = None,
+    ):
+        self.path = Path(path).expanduser()
+        self.name = name if name else self.path.name
+        self.dir_list = DirectoryList(str(self.path), history=history)
         self.notes = None
 
 
+@dataclass
+class Notebooks:
+    """Notebooks class
+    Description:
+        Registry of notebooks picked from as one list. Each notebook is
+        scanned in its own thread and entries are streamed to the picker as
+        they arrive, so a slow notebook (e.g. a network mount) never holds
+        back results from fast ones. Frecent notes from every notebook are
+        sent first, highest score first. Picker lines are
+        "<absolute path>\t[<notebook>] <entry>"; fzf only shows the tag and
+        entry, and `{1}` refers to the absolute path in preview commands.
+    Attributes:
+        notebooks (List): Registered notebooks
+        history (Optional[Frecency]): Access history used for ranking
+        rank_grace (float): Seconds to wait for every notebook's frecent notes
+    Example:
+        >>> Notebooks.from_dirs({"work": "~/work/wiki"}).pick()
+        ['/home/user/work/wiki/todo.wiki\t[work] wiki/todo.wiki']
+    """
+
+    notebooks: List[Notebook]
+    history: Optional[Frecency] = None
+    rank_grace: float = 0.25
+
+    @classmethod
+    def from_dirs(
+        cls, dirs: Dict[str, str], history: Optional[Frecency] = None
+    ) -> "Notebooks":
+        return cls(
+            [Notebook(Path(p), name, history) for name, p in dirs.items()], history
+        )
+
+    def stream(self) -> Iterator[str]:
+        """Yield frecent entries across notebooks, then the rest as scanned
+
+        Each scanner resolves its own root and checks its frecent notes still
+        exist before listing, so only that notebook waits on a slow mount.
+        Frecent notes reported within `rank_grace` seconds are merged and
+        sent highest score first; a late notebook's follow when they arrive.
+        """
+        entries: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def scan(i: int, notebook: Notebook):
+            try:
+                dir_list = notebook.dir_list
+                ranked = []
+                if self.history is not None:
+                    for file_path, score in self.history.ranked(notebook.path):
+                        if stop.is_set():
+                            return
+                        if file_path.is_file():
+                            entry = dir_list.entry_name(file_path)
+                            ranked.append(
+                                (score, f"{file_path}\t[{notebook.name}] {entry}")
+                            )
+                entries.put(("ranked", i, ranked))
+                for entry in dir_list.iter_list():
+                    if stop.is_set():
+                        return
+                    entries.put(
+                        (
+                            "entry",
+                            i,
+                            f"{dir_list.entry_path(entry)}\t[{notebook.name}] {entry}",
+                        )
+                    )
+            except OSError:
+                pass
+            finally:
+                entries.put(("done", i, None))
+
+        sent = set()
+
+        def send(lines: Iterable[str]) -> Iterator[str]:
+            for line in lines:
+                key = line.split("\t", 1)[0]
+                if key not in sent:
+                    sent.add(key)
+                    yield line
+
+        try:
+            # Daemon threads: a scan stuck on a hung mount must not block exit.
+            for i, notebook in enumerate(self.notebooks):
+                threading.Thread(target=scan, args=(i, notebook), daemon=True).start()
+            remaining = len(self.notebooks)
+            reported, ranked, early = set(), [], []
+            deadline = time.monotonic() + self.rank_grace
+            while len(reported) < len(self.notebooks):
+                try:
+                    kind, i, value = entries.get(
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except queue.Empty:
+                    break
+                if kind == "ranked":
+                    reported.add(i)
+                    ranked.extend(value)
+                elif kind == "entry":
+                    early.append(value)
+                else:
+                    reported.add(i)
+                    remaining -= 1
+            ranked.sort(key=lambda item: item[0], reverse=True)
+            yield from send(line for _, line in ranked)
+            yield from send(early)
+            while remaining:
+                kind, i, value = entries.get()
+                if kind == "ranked":
+                    value.sort(key=lambda item: item[0], reverse=True)
+                    yield from send(line for _, line in value)
+                elif kind == "entry":
+                    yield from send([value])
+                else:
+                    remaining -= 1
+        finally:
+            stop.set()
+
+    @staticmethod
+    def entry_path(line: str) -> Path:
+        """Map a picker line back to its absolute path"""
+        return Path(line.split("\t", 1)[0])
+
+    def pick(self, opts: Optional[str] = "") -> List:
+        opts = f"--delimiter='\t' --with-nth=2.. {opts}"
+        return FzF().prompt(choices=self.stream(), opts=opts)
+
+
 class Terminal:
     """Handle terminal operations
 
@@ -0,0 +1,141 @@
+"""Access history and frecency ranking for pynote."""
+
+import fcntl
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+@dataclass
+class Frecency:
+    """Frecency class
+    Description:
+        Append-only access history with an exponentially decaying score.
+        Each path is stored as a single "effective timestamp" T such that
+        score(now) == 2 ** ((T - now) / half_life). Recording an open merges
+        the new timestamp into T in O(1) and appends one line to the log;
+        the log is compacted to one line per path once it grows too long.
+    Attributes:
+        path (Path): History log file
+        half_life (float): Seconds for a score to halve
+        min_score (float): Entries scoring below this are dropped on compaction
+        entries (Dict): Effective timestamp keyed by absolute path
+    Example:
+        >>> history = Frecency(Path("~/.config/pytui/history.log"))
+        >>> history.record(Path("~/wiki/notes/todo.wiki"))
+        >>> next(history.ranked())
+        (PosixPath('/home/user/wiki/notes/todo.wiki'), 1.0)
+    """
+
+    path: Path
+    half_life: float = 7 * 24 * 60 * 60
+    min_score: float = 0.001
+    entries: Dict[str, float] = field(default_factory=dict)
+    _lines: int = field(default=0, repr=False)
+
+    def __post_init__(self):
+        self.path = Path(self.path).expanduser()
+        self._rate = math.log(2) / self.half_life
+        self.load()
+
+    def load(self) -> Dict[str, float]:
+        """Replay the history log into memory"""
+        self.entries.clear()
+        self._lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    stamp, _, key = line.rstrip("\n").partition("\t")
+                    try:
+                        self._merge(key, float(stamp))
+                    except ValueError:
+                        continue
+                    self._lines += 1
+        except FileNotFoundError:
+            pass
+        return self.entries
+
+    def _merge(self, key: str, stamp: float) -> None:
+        """Fold one access at `stamp` into the effective timestamp of `key`"""
+        current = self.entries.get(key)
+        if current is None:
+            self.entries[key] = stamp
+            return
+        high, low = max(current, stamp), min(current, stamp)
+        self.entries[key] = high + math.log1p(
+            math.exp(self._rate * (low - high))
+        ) / self._rate
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock shared by every process using this log
+
+        The lock lives in a sibling file because compaction replaces the log.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(f"{self.path.name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def record(self, file_path: Path, when: Optional[float] = None) -> None:
+        """Record an access to `file_path`"""
+        key = str(Path(file_path).expanduser().resolve())
+        stamp = time.time() if when is None else when
+        self._merge(key, stamp)
+        with self._locked(), open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{stamp!r}\t{key}\n")
+        self._lines += 1
+        if self._lines > 2 * len(self.entries) + 64:
+            self.compact()
+
+    def score(self, file_path: Path, now: Optional[float] = None) -> float:
+        """Return the current score of `file_path`, 0.0 if never opened"""
+        stamp = self.entries.get(str(Path(file_path).expanduser().resolve()))
+        if stamp is None:
+            return 0.0
+        return self._decay(stamp, time.time() if now is None else now)
+
+    def _decay(self, stamp: float, now: float) -> float:
+        return math.exp(self._rate * (stamp - now))
+
+    def ranked(
+        self, root: Optional[Path] = None, now: Optional[float] = None
+    ) -> Iterator[Tuple[Path, float]]:
+        """Yield (path, score) highest score first, optionally under `root`"""
+        now = time.time() if now is None else now
+        prefix = None
+        if root is not None:
+            prefix = os.path.join(str(Path(root).expanduser().resolve()), "")
+        for key, stamp in sorted(
+            self.entries.items(), key=lambda item: item[1], reverse=True
+        ):
+            if prefix is None or key.startswith(prefix):
+                yield Path(key), self._decay(stamp, now)
+
+    def compact(self, now: Optional[float] = None) -> None:
+        """Rewrite the log with one line per live path
+
+        The log is re-read under the lock first, so opens appended by other
+        processes since this one loaded it are folded in, not dropped.
+        """
+        now = time.time() if now is None else now
+        with self._locked():
+            self.load()
+            self.entries = {
+                key: stamp
+                for key, stamp in self.entries.items()
+                if self._decay(stamp, now) >= self.min_score
+            }
+            tmp = self.path.with_name(f"{self.path.name}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, stamp in self.entries.items():
+                    f.write(f"{stamp!r}\t{key}\n")
+            os.replace(tmp, self.path)
+        self._lines = len(self.entries)
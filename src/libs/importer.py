@@ -0,0 +1,404 @@
+"""Bulk import of Markdown/text archives into the vimwiki layout."""
+
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+SOURCE_SUFFIXES = (".md", ".markdown", ".mdown", ".txt")
+
+_front_matter = re.compile(r"\A---\n(.*?)\n(?:---|\.\.\.)\n", re.S)
+_heading = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_fence = re.compile(r"^(\s*)(```|~~~)\s*(\S*)")
+_image = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+_link = re.compile(r"(?<!!)\[([^\]]+)\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+_autolink = re.compile(r"<(https?://[^>]+)>")
+_bold = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_italic = re.compile(r"(?<![\*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![\*\w])")
+_strike = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+_task = re.compile(r"^(\s*)[-*+]\s+\[([ xX])\]\s+")
+_bullet = re.compile(r"^(\s*)[-+]\s+")
+_code_span = re.compile(r"(`+)(.+?)\1")
+_rule = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+
+NAME_MAX = 255
+
+
+def note_name(created: datetime, title: str, n: int = 1) -> str:
+    """Return the capture file name for a note, `-n` suffixed on collision
+
+    The title is cut to keep the name within NAME_MAX bytes in UTF-8, with
+    room left for the collision suffix.
+    """
+    safe = re.sub(r"[\x00/\\]+", "-", title).strip() or "untitled"
+    stamp = created.strftime("%Y%m%d%H%M")
+    limit = NAME_MAX - len(f"{stamp}-.wiki") - len("-99999999")
+    safe = safe.encode("utf-8")[:limit].decode("utf-8", errors="ignore").rstrip()
+    suffix = f"-{n}" if n > 1 else ""
+    return f"{stamp}-{safe}{suffix}.wiki"
+
+
+def _parse_front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    match = _front_matter.match(text)
+    if not match:
+        return {}, text
+    meta: Dict[str, str] = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            meta[key.strip().lower()] = value.strip().strip("\"'")
+    return meta, text[match.end() :]
+
+
+def _parse_created(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        created = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return created.astimezone().replace(tzinfo=None) if created.tzinfo else created
+
+
+def read_header(path: Path) -> Tuple[str, datetime]:
+    """Return (title, created) for a source note without converting it"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        head = f.read(8192)
+    meta, body = _parse_front_matter(head)
+    title = meta.get("title")
+    if not title and path.suffix != ".txt":
+        for line in body.splitlines():
+            match = _heading.match(line)
+            if match and len(match.group(1)) == 1:
+                title = match.group(2)
+                break
+            if line.strip():
+                break
+    created = _parse_created(meta.get("created") or meta.get("date"))
+    if created is None:
+        created = datetime.fromtimestamp(path.stat().st_mtime)
+    return title or path.stem, created
+
+
+def _convert_inline(line: str, link_for: Callable[[str], Optional[str]]) -> str:
+    spans: List[str] = []
+
+    def stash(text: str) -> str:
+        spans.append(text)
+        return f"\x00{len(spans) - 1}\x00"
+
+    def link(match: re.Match) -> str:
+        text, target = match.group(1), match.group(2)
+        wiki = link_for(target)
+        if wiki is not None:
+            return stash(f"[[{wiki}|{text}]]" if text != wiki else f"[[{wiki}]]")
+        return stash(f"[[{target}|{text}]]")
+
+    line = _code_span.sub(lambda m: stash(m.group(0)), line)
+    line = _image.sub(lambda m: stash(f"{{{{{m.group(2)}|{m.group(1)}}}}}"), line)
+    line = _link.sub(link, line)
+    line = _autolink.sub(lambda m: stash(f"[[{m.group(1)}]]"), line)
+    line = _italic.sub(r"_\1_", line)
+    line = _bold.sub(r"*\2*", line)
+    line = _strike.sub(r"~~\1~~", line)
+    return re.sub(r"\x00(\d+)\x00", lambda m: spans[int(m.group(1))], line)
+
+
+def markdown_to_vimwiki(
+    text: str, link_for: Callable[[str], Optional[str]] = lambda target: None
+) -> str:
+    """Convert a Markdown body to vimwiki syntax
+
+    `link_for` maps a Markdown link target to a vimwiki page name, or None to
+    keep the target as written.
+    """
+    out: List[str] = []
+    fence: Optional[str] = None
+    for line in text.splitlines():
+        if fence is not None:
+            if line.strip().startswith(fence):
+                out.append("}}}")
+                fence = None
+            else:
+                out.append(line)
+            continue
+        match = _fence.match(line)
+        if match:
+            fence = match.group(2)
+            out.append(f"{match.group(1)}{{{{{{{match.group(3)}")
+            continue
+        match = _heading.match(line)
+        if match:
+            bar = "=" * len(match.group(1))
+            out.append(f"{bar} {_convert_inline(match.group(2), link_for)} {bar}")
+            continue
+        if _rule.match(line):
+            out.append("----")
+            continue
+        line = _task.sub(
+            lambda m: f"{m.group(1)}* [{'X' if m.group(2) in 'xX' else ' '}] ", line
+        )
+        line = _bullet.sub(lambda m: f"{m.group(1)}* ", line)
+        out.append(_convert_inline(line, link_for))
+    if fence is not None:
+        out.append("}}}")
+    return "\n".join(out) + "\n"
+
+
+def convert_note(
+    source: Path, title: str, created: datetime, links: Dict[str, str]
+) -> str:
+    """Return the vimwiki text for `source` in the capture layout"""
+    with open(source, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    _, body = _parse_front_matter(text)
+    if source.suffix == ".txt":
+        converted = body if body.endswith("\n") else f"{body}\n"
+    else:
+        lines = body.splitlines()
+        for i, line in enumerate(lines):
+            match = _heading.match(line)
+            if match and len(match.group(1)) == 1 and match.group(2) == title:
+                del lines[i]
+                break
+            if line.strip():
+                break
+
+        def link_for(target: str) -> Optional[str]:
+            if "://" in target or target.startswith(("#", "mailto:")):
+                return None
+            path, _, anchor = unquote(target).partition("#")
+            resolved = os.path.normpath(source.parent.joinpath(path))
+            page = links.get(resolved) or links.get(f"{resolved}.md")
+            if page is None:
+                return None
+            return f"{page}#{anchor}" if anchor else page
+
+        converted = markdown_to_vimwiki("\n".join(lines).lstrip("\n"), link_for)
+    return f"= {title} =\n*Created:* {created.strftime('%Y-%m-%d %H:%M')}\n\n{converted}"
+
+
+_links: Dict[str, str] = {}
+
+
+def _init_worker(links: Dict[str, str]) -> None:
+    """Process pool initializer: receive the link map once per worker"""
+    global _links
+    _links = links
+
+
+def _convert_batch(
+    batch: List[Tuple[str, str, str, str]],
+) -> List[Tuple[str, str, str, float, float, Optional[str]]]:
+    """Process pool worker: convert a batch of planned notes
+
+    A note that fails is returned with its error instead of text, so one bad
+    file cannot sink the rest of the batch.
+    """
+    results = []
+    for source, dest, title, created in batch:
+        try:
+            stat = os.stat(source)
+            text = convert_note(
+                Path(source), title, datetime.fromisoformat(created), _links
+            )
+        except (OSError, ValueError) as e:
+            results.append((source, dest, "", 0.0, 0.0, str(e)))
+            continue
+        results.append((source, dest, text, stat.st_atime, stat.st_mtime, None))
+    return results
+
+
+@dataclass
+class ImportProgress:
+    """ImportProgress class
+    Description:
+        Running totals reported after each written batch
+    Attributes:
+        done (int): Notes written so far, including earlier runs
+        total (int): Notes in the import plan
+        written (int): Notes written by this run
+        elapsed (float): Seconds spent by this run
+        errors (List): (source, error) for notes that failed in this run
+    """
+
+    done: int
+    total: int
+    written: int
+    elapsed: float
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class Importer:
+    """Importer class
+    Description:
+        Converts a tree of Markdown/text notes into `YYYYmmddHHMM-title.wiki`
+        files. Names are planned up front so links between notes can be
+        rewritten, conversion runs in a process pool, and every written batch
+        is journalled so an interrupted import resumes where it stopped.
+    Attributes:
+        source (Path): Archive to import
+        dest (Path): Notebook directory to write into
+        state_dir (Path): Where the plan and journal are kept
+        workers (Optional[int]): Process pool size, defaults to the CPU count
+        batch_size (int): Notes converted and written per batch
+    Example:
+        >>> Importer(Path("~/old-notes"), Path("~/wiki/notes"), state_dir).run()
+    """
+
+    source: Path
+    dest: Path
+    state_dir: Path
+    workers: Optional[int] = None
+    batch_size: int = 64
+    plan: Dict[str, Tuple[str, str, str]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.source = Path(self.source).expanduser().resolve()
+        self.dest = Path(self.dest).expanduser().resolve()
+        key = hashlib.sha1(f"{self.source}\0{self.dest}".encode()).hexdigest()[:12]
+        self.state_dir = Path(self.state_dir).expanduser()
+        self.plan_file = self.state_dir.joinpath(f"import-{key}.plan")
+        self.done_file = self.state_dir.joinpath(f"import-{key}.done")
+        self.failed_file = self.state_dir.joinpath(f"import-{key}.failed")
+
+    def sources(self) -> Iterator[Path]:
+        """Yield importable files under the source directory"""
+        for root, dirs, files in os.walk(self.source):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.lower().endswith(SOURCE_SUFFIXES):
+                    yield Path(root, name)
+
+    def load_plan(self) -> Dict[str, Tuple[str, str, str]]:
+        """Load the saved plan, then plan names for any new sources"""
+        try:
+            with open(self.plan_file, "r", encoding="utf-8") as f:
+                self.plan = {k: tuple(v) for k, v in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.plan = {}
+        taken = {dest for dest, _, _ in self.plan.values()}
+        if self.dest.exists():
+            taken.update(p.name for p in self.dest.iterdir())
+        added = False
+        for source in self.sources():
+            if str(source) in self.plan:
+                continue
+            try:
+                title, created = read_header(source)
+            except OSError:
+                continue
+            name = note_name(created, title)
+            n = 1
+            while name in taken:
+                n += 1
+                name = note_name(created, title, n)
+            taken.add(name)
+            self.plan[str(source)] = (name, title, created.isoformat())
+            added = True
+        if added:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.plan_file.with_name(f"{self.plan_file.name}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.plan, f)
+            os.replace(tmp, self.plan_file)
+        return self.plan
+
+    def completed(self) -> set:
+        """Return the sources already written by earlier runs
+
+        Failures are only reported in the `.failed` file and are retried on
+        the next run.
+        """
+        try:
+            with open(self.done_file, "r", encoding="utf-8") as f:
+                return {line.rstrip("\n") for line in f if line.endswith("\n")}
+        except FileNotFoundError:
+            return set()
+
+    def run(
+        self, progress: Optional[Callable[[ImportProgress], None]] = None
+    ) -> ImportProgress:
+        """Import every pending note, reporting after each batch"""
+        self.load_plan()
+        links = {src: Path(dest).stem for src, (dest, _, _) in self.plan.items()}
+        done = self.completed()
+        pending = [
+            (src, dest, title, created)
+            for src, (dest, title, created) in self.plan.items()
+            if src not in done and os.path.exists(src)
+        ]
+        batches = [
+            pending[i : i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        status = ImportProgress(len(done), len(self.plan), 0, 0.0)
+        start = time.monotonic()
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(links,)
+        ) as pool, open(self.done_file, "a", encoding="utf-8") as journal, open(
+            self.failed_file, "w", encoding="utf-8"
+        ) as failures:
+            limit = 2 * (self.workers or os.cpu_count() or 1)
+            queue = iter(batches)
+            running = set()
+            while True:
+                for batch in queue:
+                    running.add(pool.submit(_convert_batch, batch))
+                    if len(running) >= limit:
+                        break
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    written, failed = self._write_batch(future.result())
+                    journal.writelines(f"{src}\n" for src in written)
+                    failures.writelines(
+                        f"{src}\t{' '.join(error.split())}\n" for src, error in failed
+                    )
+                    for f in (journal, failures):
+                        f.flush()
+                        os.fsync(f.fileno())
+                    status.done += len(written) + len(failed)
+                    status.written += len(written)
+                    status.errors.extend(failed)
+                    status.elapsed = time.monotonic() - start
+                    if progress:
+                        progress(status)
+        return status
+
+    def _write_batch(
+        self, results: List[Tuple[str, str, str, float, float, Optional[str]]]
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Write converted notes, returning (written sources, failures)"""
+        written: List[str] = []
+        failed: List[Tuple[str, str]] = []
+        for source, dest, text, atime, mtime, error in results:
+            if error is not None:
+                failed.append((source, error))
+                continue
+            target = self.dest.joinpath(dest)
+            try:
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.utime(target, (atime, mtime))
+            except OSError as e:
+                failed.append((source, str(e)))
+                continue
+            written.append(source)
+        return written, failed
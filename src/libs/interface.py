@@ -16,15 +16,27 @@ from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.completion import Completer, WordCompleter
 from prompt_toolkit.formatted_text import HTML, to_formatted_text
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.layout.containers import HSplit, VSplit, Window, WindowAlign
+from prompt_toolkit.filters import has_focus
+from prompt_toolkit.layout.containers import (
+    ConditionalContainer,
+    HSplit,
+    VSplit,
+    Window,
+    WindowAlign,
+)
 from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
 from prompt_toolkit.layout.layout import Layout
+from prompt_toolkit.layout.processors import BeforeInput
 from prompt_toolkit.lexers import PygmentsLexer
 from prompt_toolkit.shortcuts import prompt
 from prompt_toolkit.styles import Style
 from pygments.lexers.html import HtmlLexer
 
-from .apis import DirectoryList, Notebook, Note
+from .apis import DirectoryList, Notebook, Notebooks, Note
+from .frecency import Frecency
+from .importer import Importer, ImportProgress
+from .snapshot import Snapshot, apply_snapshots
+from .viewer import MappedFileControl
 from ._strings import PStrings
 
 executor = ThreadPoolExecutor(max_workers=1)
@@ -101,6 +113,14 @@ class Settings:
     def __getitem__(self, key):
         return self.settings[key]
 
+    def notebooks(self) -> Dict[str, str]:
+        """Return the optional "notebooks" registry, defaulting to notebook_dir"""
+        notebooks = self.settings.get("notebooks")
+        if not notebooks:
+            notebook_dir = self.settings["notebook_dir"]
+            notebooks = {Path(notebook_dir).expanduser().name: notebook_dir}
+        return notebooks
+
 def get_term_size():
     try:
         return os.get_terminal_size()
@@ -117,7 +137,11 @@ class State:
     layout: Optional[Layout] = None
     termsize: Optional[os.terminal_size] = get_term_size()
     main_window_html: str = "<h3>TEST</h3>"
+    history: Optional[Frecency] = None
 
+    def __post_init__(self):
+        if self.history is None:
+            self.history = Frecency(self.settings.config_dir.joinpath("history.log"))
 
 
 @dataclass
@@ -153,6 +177,7 @@ class UI:
     main_layout: Layout = field(init=False)
     app: Application = field(init=False)
     kb: KeyBindings = field(default_factory=KeyBindings)
+    viewer: Optional[MappedFileControl] = None
 
     def run(self, state: State):
         self.keybinds()
@@ -207,6 +232,14 @@ class UI:
             width=PStrings.menu_notes.__sizeof__(),
             style="class:title",
         )
+        self.main_menu_view = Window(
+            content=FormattedTextControl(
+                text=PStrings.menu_view,
+            ),
+            align=WindowAlign.LEFT,
+            width=PStrings.menu_view.__sizeof__(),
+            style="class:title",
+        )
         self.main_menu_input = Window(
             content=FormattedTextControl(
                 text=PStrings.std,
@@ -230,6 +263,7 @@ class UI:
                 self.main_menu_help,
                 self.main_menu_options,
                 self.main_menu_notes,
+                self.main_menu_view,
                 self.main_menu_input,
                 self.main_menu_time,
             ],
@@ -280,6 +314,79 @@ class UI:
             )
         )
 
+    def viewer_layout(self, file_path: Path) -> Layout:
+        if self.viewer is not None:
+            self.viewer.index.close()
+        self.viewer = MappedFileControl(
+            file_path, on_progress=lambda: self.app.invalidate()
+        )
+        viewer_window = Window(content=self.viewer, style="class:bg1")
+        mode = {"prefix": "/"}
+
+        def accept(buff: Buffer) -> bool:
+            if mode["prefix"] == ":":
+                if buff.text.strip().isdigit():
+                    self.viewer.goto(int(buff.text) - 1)
+            else:
+                self.viewer.match = None
+                self.viewer.search(buff.text)
+            get_app().layout.focus(viewer_window)
+            return False
+
+        viewer_input = Buffer(multiline=False, accept_handler=accept)
+        kb = KeyBindings()
+
+        @kb.add("/", filter=has_focus(viewer_window))
+        @kb.add(":", filter=has_focus(viewer_window))
+        def prompt_(event):
+            mode["prefix"] = event.data
+            event.app.layout.focus(viewer_input)
+
+        @kb.add("escape", filter=has_focus(viewer_input))
+        def cancel(event):
+            viewer_input.reset()
+            event.app.layout.focus(viewer_window)
+
+        @kb.add("q", filter=has_focus(viewer_window))
+        def close(event):
+            self.viewer.index.close()
+            self.viewer = None
+            self.app.layout = self.state.layout = WindowTemplates.home(self)
+
+        return Layout(
+            container=HSplit(
+                [
+                    self.menu_bar(),
+                    viewer_window,
+                    ConditionalContainer(
+                        Window(
+                            content=BufferControl(
+                                buffer=viewer_input,
+                                input_processors=[
+                                    BeforeInput(lambda: mode["prefix"])
+                                ],
+                            ),
+                            height=1,
+                            style="class:title",
+                        ),
+                        filter=has_focus(viewer_input),
+                    ),
+                    ConditionalContainer(
+                        Window(
+                            content=FormattedTextControl(
+                                text=lambda: self.viewer.status() if self.viewer else ""
+                            ),
+                            height=1,
+                            style="class:title",
+                        ),
+                        filter=~has_focus(viewer_input),
+                    ),
+                ],
+                key_bindings=kb,
+            ),
+            focused_element=viewer_window,
+        )
+
     def master_layout(self) -> Layout:
         wrapper = HSplit(
             [
@@ -304,13 +411,25 @@ class UI:
         @self.kb.add("c-n")
         async def notes(event):
             opts = f"--reverse --multi --cycle"
-            note = DirectoryList(
-                self.state.settings["notebook_dir"]
-            ).pick_or_return_input(opts=opts)
-            noteptr: Path = (
-                Path(self.state.settings["wiki_dir"]).joinpath(note[0]).expanduser()
+            notes = Notebooks.from_dirs(
+                self.state.settings.notebooks(), history=self.state.history
             )
-            launch_nvim(noteptr)
+            note = notes.pick(opts=opts)
+            noteptr: Path = notes.entry_path(note[0])
+            launch_nvim(noteptr, history=self.state.history)
+            get_app().invalidate()
+
+        @self.kb.add("c-o")
+        async def view(event):
+            opts = f"--reverse --cycle"
+            notes = Notebooks.from_dirs(
+                self.state.settings.notebooks(), history=self.state.history
+            )
+            note = notes.pick(opts=opts)
+            if note:
+                self.app.layout = self.state.layout = WindowTemplates.viewer(
+                    self, notes.entry_path(note[0])
+                )
             get_app().invalidate()
 
         @self.kb.add("f2")
@@ -329,6 +448,10 @@ class WindowTemplates:
     def options(ui: UI) -> Layout:
         return ui.formatted_window_layout()
 
+    @staticmethod
+    def viewer(ui: UI, file_path: Path) -> Layout:
+        return ui.viewer_layout(file_path)
+
 
 class Status(Enum):
     """Status Codes Enum
@@ -409,34 +532,35 @@ class CLI:
     bat: bool = which("bat") is not None
     tmux: bool = os.environ.get("TMUX") is not None
     settings: Settings = field(default_factory=Settings)
+    history: Optional[Frecency] = None
+
+    def __post_init__(self):
+        if self.history is None:
+            self.history = Frecency(self.settings.config_dir.joinpath("history.log"))
 
     def dir_search(self, directory: str):
-        _results = DirectoryList(directory).pick_or_return_input()
+        dir_list = DirectoryList(directory, history=self.history)
+        _results = dir_list.pick_or_return_input()
         try:
-            launch_nvim(_results[1])
+            launch_nvim(dir_list.entry_path(_results[0]), history=self.history)
         except IndexError:
             print("No file selected.")
 
     def wiki_capture(self):
         if self.bat:
-            _preview = (
-                f"bat --style=plain --color=always {self.settings['wiki_dir']}/{{}}"
-            )
+            _preview = "bat --style=plain --color=always {1}"
         else:
-            _preview = f"cat {self.settings['wiki_dir']}/{{}}"
+            _preview = "cat {1}"
         if self.tmux:
             opts = f'--preview-window=up,20 --preview="{_preview}" --print-query'
         else:
             opts = (
                 f'--preview-window=up,20 --border --preview="{_preview}" --print-query'
             )
-        selection = DirectoryList(self.settings["notebook_dir"]).pick_or_return_input(
-            opts
-        )
+        notes = Notebooks.from_dirs(self.settings.notebooks(), history=self.history)
+        selection = notes.pick(opts)
         try:
-            file_ptr = (
-                Path(self.settings["notebook_dir"]).expanduser().joinpath(selection[1])
-            )
+            file_ptr = notes.entry_path(selection[1])
         except IndexError:
             timestamp = datetime.now().strftime("%Y%m%d%H%M")
             file_ptr = (
@@ -449,12 +573,57 @@ class CLI:
                 f.write(capture_template.decode())
                 f.flush()
                 f.close()
+        if self.history is not None:
+            self.history.record(file_ptr)
         subprocess.run(
             [self.settings["editor"], file_ptr.name],
-            cwd=Path(self.settings["notebook_dir"]).expanduser(),
+            cwd=file_ptr.parent,
+        )
+
+    def wiki_import(self, source: str):
+        reported = 0
+
+        def report(status: ImportProgress):
+            nonlocal reported
+            for src, error in status.errors[reported:]:
+                print(f"Failed to import {src}: {error}")
+            reported = len(status.errors)
+            print(
+                f"Imported {status.done}/{status.total} notes "
+                f"({status.rate:.1f} notes/s)"
+            )
+
+        status = Importer(
+            Path(source),
+            Path(self.settings["notebook_dir"]),
+            self.settings.config_dir,
+        ).run(progress=report)
+        print(
+            f"Import finished: {status.written} notes written, "
+            f"{len(status.errors)} failed."
+        )
+
+    def wiki_snapshot(self, dest: str):
+        result = Snapshot(Path(self.settings["wiki_dir"]), Path(dest)).run()
+        if result.archive is None:
+            print(f"No changes ({result.elapsed:.2f}s).")
+        else:
+            print(
+                f"Wrote {result.archive}: {len(result.changed)} changed, "
+                f"{len(result.deleted)} deleted, {result.hashed} hashed "
+                f"({result.elapsed:.2f}s)"
+            )
+
+    def wiki_restore(self, archives: List[str]):
+        applied = apply_snapshots(
+            [Path(a) for a in archives], Path(self.settings["wiki_dir"])
         )
+        print(f"Applied {len(applied)} snapshots to {self.settings['wiki_dir']}.")
 
 
-def launch_nvim(file_path: Path):
+def launch_nvim(file_path: Path, history: Optional[Frecency] = None):
+    file_path = Path(file_path)
+    if history is not None:
+        history.record(file_path)
     subprocess.run(["nvim", file_path.name], cwd=file_path.parent)
     print("")
@@ -0,0 +1,299 @@
+"""Incremental, content-hashed snapshots of a wiki directory."""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+META_NAME = ".pytui-snapshot.json"
+MANIFEST_NAME = "manifest.json"
+
+_snapshot_id = re.compile(r"[0-9A-Za-z_-]+")
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """Return the sha256 of `path`, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _spool(f, spool, block_size: int = 1 << 20) -> str:
+    """Copy `f` into `spool` and return the sha256 of the bytes copied"""
+    digest = hashlib.sha256()
+    while block := f.read(block_size):
+        digest.update(block)
+        spool.write(block)
+    spool.seek(0)
+    return digest.hexdigest()
+
+
+def scan(root: Path, skip: Optional[Path] = None) -> Iterator[Tuple[str, int, int]]:
+    """Yield (relative path, size, mtime_ns) for every regular file under `root`"""
+    stack = [str(root)]
+    skip_dir = str(skip) if skip else None
+    prefix = len(str(root)) + 1
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path != skip_dir:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield entry.path[prefix:], stat.st_size, stat.st_mtime_ns
+
+
+@dataclass
+class SnapshotResult:
+    """SnapshotResult class
+    Description:
+        Outcome of one snapshot run
+    Attributes:
+        archive (Optional[Path]): Written archive, None when nothing changed
+        changed (List): Added or modified paths
+        deleted (List): Paths removed since the previous snapshot
+        hashed (int): Files whose contents had to be rehashed
+        elapsed (float): Seconds spent
+    """
+
+    archive: Optional[Path]
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    hashed: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class Snapshot:
+    """Snapshot class
+    Description:
+        Keeps a manifest of {path: [size, mtime_ns, sha256]} next to the
+        archives in `dest`. Files whose (size, mtime_ns) match the manifest
+        keep their recorded hash; only the rest are rehashed, in a thread
+        pool. Each run writes `snapshot-<id>.tar.gz` holding the changed
+        files and a metadata member listing deletions, to be applied in
+        order on top of the previous snapshot with `apply_snapshots`.
+    Attributes:
+        source (Path): Directory to snapshot
+        dest (Path): Directory holding the manifest and archives
+        workers (Optional[int]): Hashing threads
+    Example:
+        >>> Snapshot(Path("~/wiki"), Path("~/backups/wiki")).run()
+        SnapshotResult(archive=PosixPath('.../snapshot-20240102030405.tar.gz'), ...)
+    """
+
+    source: Path
+    dest: Path
+    workers: Optional[int] = None
+    manifest: Dict[str, List] = field(default_factory=dict)
+    last_id: Optional[str] = None
+
+    def __post_init__(self):
+        self.source = Path(self.source).expanduser().resolve()
+        self.dest = Path(self.dest).expanduser().resolve()
+        self.manifest_file = self.dest.joinpath(MANIFEST_NAME)
+
+    def load_manifest(self) -> Dict[str, List]:
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.manifest, self.last_id = data["files"], data["id"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self.manifest, self.last_id = {}, None
+        return self.manifest
+
+    def save_manifest(self) -> None:
+        tmp = self.manifest_file.with_name(f"{MANIFEST_NAME}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"id": self.last_id, "files": self.manifest}, f)
+        os.replace(tmp, self.manifest_file)
+
+    def _new_id(self) -> str:
+        base = datetime.now().strftime("%Y%m%d%H%M%S")
+        snapshot_id, n = base, 1
+        while self.dest.joinpath(f"snapshot-{snapshot_id}.tar.gz").exists():
+            n += 1
+            snapshot_id = f"{base}-{n}"
+        return snapshot_id
+
+    def run(self) -> SnapshotResult:
+        """Write an incremental archive of what changed since the last run"""
+        start = time.monotonic()
+        self.load_manifest()
+        current: Dict[str, List] = {}
+        stale: List[str] = []
+        for rel, size, mtime in scan(self.source, skip=self.dest):
+            if rel == META_NAME:
+                continue
+            known = self.manifest.get(rel)
+            if known and known[0] == size and known[1] == mtime:
+                current[rel] = known
+            else:
+                current[rel] = [size, mtime, None]
+                stale.append(rel)
+
+        def rehash(path: str) -> Optional[str]:
+            try:
+                return hash_file(path)
+            except FileNotFoundError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            paths = [os.path.join(self.source, rel) for rel in stale]
+            for rel, digest in zip(stale, pool.map(rehash, paths)):
+                current[rel][2] = digest
+        # Files removed since the scan are treated as deleted.
+        stale = [rel for rel in stale if current[rel][2] is not None]
+        current = {rel: v for rel, v in current.items() if v[2] is not None}
+
+        changed = [
+            rel
+            for rel in stale
+            if rel not in self.manifest or self.manifest[rel][2] != current[rel][2]
+        ]
+        deleted = sorted(rel for rel in self.manifest if rel not in current)
+        result = SnapshotResult(None, changed, deleted, len(stale))
+
+        if changed or deleted or stale or self.last_id is None:
+            self.dest.mkdir(parents=True, exist_ok=True)
+            if changed or deleted or self.last_id is None:
+                snapshot_id = self._new_id()
+                result.archive, archived, vanished = self._write_archive(
+                    snapshot_id, changed, deleted
+                )
+                for rel, digest in archived.items():
+                    current[rel][2] = digest
+                for rel in vanished:
+                    del current[rel]
+                    result.changed.remove(rel)
+                    if rel in self.manifest:
+                        result.deleted.append(rel)
+                result.deleted.sort()
+                self.last_id = snapshot_id
+            self.manifest = current
+            self.save_manifest()
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def _write_archive(
+        self, snapshot_id: str, changed: List[str], deleted: List[str]
+    ) -> Tuple[Path, Dict[str, str], List[str]]:
+        """Write the archive; return it, archived hashes and vanished paths
+
+        Each file is read once into a spool (memory, spilling to disk) and
+        archived from there, so the recorded size and hash always match the
+        archived bytes even if the note is saved mid-run; its new mtime makes
+        the next run pick it up again. Files removed since the scan are
+        recorded as deleted. The metadata member is written last so it can
+        list them.
+        """
+        archive = self.dest.joinpath(f"snapshot-{snapshot_id}.tar.gz")
+        tmp = archive.with_name(f"{archive.name}.tmp")
+        archived: Dict[str, str] = {}
+        vanished: List[str] = []
+        try:
+            with tarfile.open(tmp, "w:gz") as tar:
+                for rel in sorted(changed):
+                    path = os.path.join(self.source, rel)
+                    try:
+                        f = open(path, "rb")
+                    except FileNotFoundError:
+                        vanished.append(rel)
+                        continue
+                    with f, tempfile.SpooledTemporaryFile(8 << 20) as spool:
+                        archived[rel] = _spool(f, spool)
+                        info = tar.gettarinfo(arcname=rel, fileobj=f)
+                        info.size = spool.seek(0, os.SEEK_END)
+                        spool.seek(0)
+                        tar.addfile(info, spool)
+                meta = json.dumps(
+                    {
+                        "id": snapshot_id,
+                        "base": self.last_id,
+                        "deleted": sorted(
+                            deleted + [r for r in vanished if r in self.manifest]
+                        ),
+                    }
+                ).encode()
+                info = tarfile.TarInfo(META_NAME)
+                info.size, info.mtime = len(meta), int(time.time())
+                tar.addfile(info, io.BytesIO(meta))
+            os.replace(tmp, archive)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return archive, archived, vanished
+
+
+def _check_meta(meta: Dict, target: Path) -> None:
+    """Reject snapshot metadata that would touch paths outside `target`"""
+    for key in ("id", "base"):
+        value = meta.get(key)
+        if value is None and key == "base":
+            continue
+        if not isinstance(value, str) or not _snapshot_id.fullmatch(value):
+            raise ValueError(f"Invalid snapshot {key}: {value!r}")
+    root = target.resolve()
+    for rel in meta.get("deleted", []):
+        if os.path.isabs(rel) or not root.joinpath(rel).resolve().is_relative_to(
+            root
+        ):
+            raise ValueError(f"Refusing to delete outside {root}: {rel!r}")
+
+
+def applied_snapshot(target: Path) -> Optional[str]:
+    """Return the id of the last snapshot applied to `target`, if any"""
+    try:
+        with open(Path(target).expanduser().joinpath(META_NAME), "r") as f:
+            return json.load(f)["id"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def apply_snapshots(archives: List[Path], target: Path) -> List[str]:
+    """Apply snapshot archives in order on top of `target`
+
+    The id of each applied snapshot is recorded in `target/META_NAME`, and
+    every archive must be based on the id recorded there (or on nothing,
+    for a target that has never been restored into).
+
+    Raises:
+        ValueError: An archive is out of order or has unsafe metadata.
+    """
+    target = Path(target).expanduser()
+    target.mkdir(parents=True, exist_ok=True)
+    state = target.joinpath(META_NAME)
+    current = applied_snapshot(target)
+    applied: List[str] = []
+    for archive in archives:
+        with tarfile.open(Path(archive).expanduser(), "r:gz") as tar:
+            meta = json.load(tar.extractfile(META_NAME))
+            _check_meta(meta, target)
+            if meta["base"] != current:
+                raise ValueError(
+                    f"{archive} is based on {meta['base']}, "
+                    f"but {target} is at {current}"
+                )
+            for rel in meta["deleted"]:
+                target.joinpath(rel).unlink(missing_ok=True)
+            members = [m for m in tar.getmembers() if m.name != META_NAME]
+            tar.extractall(target, members=members, filter="data")
+        current = meta["id"]
+        tmp = state.with_name(f"{META_NAME}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"id": current}, f)
+        os.replace(tmp, state)
+        applied.append(current)
+    return applied
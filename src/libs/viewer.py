@@ -0,0 +1,321 @@
+"""Read-only, memory-mapped viewer for large notes and logs."""
+
+import mmap
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.controls import UIContent, UIControl
+from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
+
+
+class LineIndex:
+    """Lazy line index over a memory-mapped file
+
+    Description:
+        A background thread counts newlines per fixed-size chunk of the
+        mapping. Locating a line bisects the chunk table and then scans at
+        most one chunk, so the index stays small and only the bytes of the
+        lines actually requested are ever decoded. Lookups past what has
+        been indexed so far block until the builder catches up.
+
+    Attributes:
+        path (Path): Mapped file.
+        size (int): File size in bytes.
+        complete (bool): True once the whole file has been indexed.
+
+    Example:
+        >>> index = LineIndex(Path("big.log"))
+        >>> index.lines(1_000_000, 2)
+        ['line 1000001', 'line 1000002']
+    """
+
+    chunk_size: int = 1 << 16
+
+    def __init__(
+        self, path: Path, on_progress: Optional[Callable[[], None]] = None
+    ):
+        self.path = Path(path).expanduser()
+        self._file = open(self.path, "rb")
+        self.size = self.path.stat().st_size
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else b""
+        )
+        # _chunks[i] is the number of newlines before offset i * chunk_size.
+        self._chunks = array("Q")
+        self._newlines = 0
+        self._ready = threading.Condition()
+        self._closed = False
+        self._on_progress = on_progress
+        self.complete = False
+        self._builder = threading.Thread(target=self._build, daemon=True)
+        self._builder.start()
+
+    def _build(self):
+        pending = array("Q")
+        newlines = 0
+        for n, offset in enumerate(range(0, self.size, self.chunk_size)):
+            if self._closed:
+                return
+            pending.append(newlines)
+            newlines += self._map[offset : offset + self.chunk_size].count(b"\n")
+            if n % 256 == 255:
+                self._publish(pending, newlines)
+                pending = array("Q")
+        self._publish(pending, newlines, complete=True)
+
+    def _publish(self, pending: array, newlines: int, complete: bool = False):
+        with self._ready:
+            self._chunks.extend(pending)
+            self._newlines = newlines
+            self.complete = complete
+            self._ready.notify_all()
+        if self._on_progress:
+            self._on_progress()
+
+    @property
+    def line_count(self) -> int:
+        """Lines indexed so far, exact once `complete` is set"""
+        if self.complete and self.size and self._map[-1:] != b"\n":
+            return self._newlines + 1
+        return self._newlines
+
+    def offset(self, line: int) -> Optional[int]:
+        """Return the byte offset where `line` starts, None past the end"""
+        if line <= 0:
+            return 0 if self.size else None
+        with self._ready:
+            self._ready.wait_for(lambda: self.complete or self._newlines >= line)
+            chunk = bisect_left(self._chunks, line) - 1
+            before = self._chunks[chunk]
+        pos = chunk * self.chunk_size
+        for _ in range(line - before):
+            pos = self._map.find(b"\n", pos) + 1
+            if pos == 0:
+                return None
+        return pos if pos < self.size else None
+
+    def line_at(self, offset: int) -> int:
+        """Return the line containing byte `offset`"""
+        chunk = offset // self.chunk_size
+        with self._ready:
+            self._ready.wait_for(lambda: self.complete or len(self._chunks) > chunk)
+            before = self._chunks[chunk]
+        start = chunk * self.chunk_size
+        return before + self._map[start:offset].count(b"\n")
+
+    def lines(self, start: int, count: int, max_bytes: int = 4096) -> List[str]:
+        """Decode up to `count` lines from `start`, each capped at `max_bytes`"""
+        result: List[str] = []
+        pos = self.offset(start)
+        while pos is not None and len(result) < count:
+            end = self._map.find(b"\n", pos)
+            stop = self.size if end == -1 else end
+            raw = self._map[pos : min(stop, pos + max_bytes)]
+            result.append(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+            if end == -1 or end + 1 >= self.size:
+                break
+            pos = end + 1
+        return result
+
+    def search(self, pattern: re.Pattern, line: int = 0) -> Optional[int]:
+        """Return the first line at or after `line` matching, wrapping once"""
+        start = self.offset(line) or 0
+        match = pattern.search(self._map, start)
+        if match is None and start:
+            # Let the wrapped pass run to the end of the starting line so a
+            # match straddling `start` is still found.
+            end = self._map.find(b"\n", start)
+            match = pattern.search(self._map, 0, self.size if end == -1 else end)
+        return None if match is None else self.line_at(match.start())
+
+    def close(self):
+        self._closed = True
+        self._builder.join()
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # A background search still holds the buffer; let GC unmap it.
+                pass
+        self._file.close()
+
+
+class MappedFileControl(UIControl):
+    """Render only the visible window of a `LineIndex`
+
+    Description:
+        Keeps its own scroll position and asks the index for exactly the
+        lines that fit in the window, so opening and scrolling cost the same
+        for a 1 KiB note and a 1 GiB log.
+
+    Attributes:
+        index (LineIndex): Index of the viewed file.
+        top (int): First visible line.
+        left (int): First visible column.
+        match (Optional[int]): Line of the last search hit.
+        message (str): Search feedback shown in the status line.
+    """
+
+    def __init__(self, path: Path, on_progress: Optional[Callable[[], None]] = None):
+        self.index = LineIndex(path, on_progress=on_progress)
+        self.top = 0
+        self.left = 0
+        self.height = 1
+        self.match: Optional[int] = None
+        self.pattern: Optional[re.Pattern] = None
+        self.message = ""
+        self._search_id = 0
+        self._on_update = on_progress
+
+    def is_focusable(self) -> bool:
+        return True
+
+    def create_content(self, width: int, height: int) -> UIContent:
+        self.height = height
+        lines = self.index.lines(self.top, height, max_bytes=4 * (self.left + width))
+        fragments = [
+            [
+                (
+                    "class:hl" if self.top + i == self.match else "",
+                    line.expandtabs()[self.left : self.left + width],
+                )
+            ]
+            for i, line in enumerate(lines)
+        ]
+        return UIContent(
+            get_line=lambda i: fragments[i],
+            line_count=len(fragments),
+            show_cursor=False,
+        )
+
+    def scroll(self, delta: int):
+        self.goto(self.top + delta)
+
+    def goto(self, line: int):
+        """Scroll so `line` is the first visible line"""
+        last = max(self.index.line_count - self.height, 0)
+        if not self.index.complete:
+            last = max(self.index.line_count - 1, 0)
+        self.top = min(max(line, 0), last)
+
+    def search(self, text: Optional[str] = None) -> Optional[threading.Thread]:
+        """Search for regex `text`, or the previous pattern, in the background
+
+        The scan runs on a daemon thread so a miss on a huge file never
+        blocks the event loop; the result is applied and `on_progress` is
+        called to redraw. Returns the thread, or None if nothing was started.
+        """
+        if text:
+            try:
+                self.pattern = re.compile(
+                    text.encode(), re.IGNORECASE | re.MULTILINE
+                )
+            except re.error as e:
+                self.message = f"Invalid pattern: {e}"
+                return None
+        if self.pattern is None:
+            return None
+        pattern = self.pattern
+        start = self.top if self.match is None else self.match + 1
+        self._search_id += 1
+        search_id = self._search_id
+        self.message = "searching…"
+
+        def run():
+            try:
+                match = self.index.search(pattern, start)
+            except (ValueError, BufferError):
+                return
+            if search_id != self._search_id:
+                return
+            self.match = match
+            if match is None:
+                self.message = "Pattern not found"
+            else:
+                self.message = ""
+                self.goto(match)
+            if self._on_update:
+                self._on_update()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def mouse_handler(self, mouse_event: MouseEvent):
+        if mouse_event.event_type == MouseEventType.SCROLL_DOWN:
+            self.scroll(3)
+        elif mouse_event.event_type == MouseEventType.SCROLL_UP:
+            self.scroll(-3)
+        else:
+            return NotImplemented
+        return None
+
+    def get_key_bindings(self) -> KeyBindings:
+        kb = KeyBindings()
+
+        @kb.add("j")
+        @kb.add("down")
+        def down(event):
+            self.scroll(1)
+
+        @kb.add("k")
+        @kb.add("up")
+        def up(event):
+            self.scroll(-1)
+
+        @kb.add("pagedown")
+        @kb.add("space")
+        @kb.add("c-f")
+        def page_down(event):
+            self.scroll(self.height)
+
+        @kb.add("pageup")
+        @kb.add("c-b")
+        def page_up(event):
+            self.scroll(-self.height)
+
+        @kb.add("c-d")
+        def half_down(event):
+            self.scroll(self.height // 2)
+
+        @kb.add("c-u")
+        def half_up(event):
+            self.scroll(-(self.height // 2))
+
+        @kb.add("g")
+        @kb.add("home")
+        def first(event):
+            self.goto(0)
+
+        @kb.add("G")
+        @kb.add("end")
+        def last(event):
+            self.goto(self.index.line_count)
+
+        @kb.add("l")
+        @kb.add("right")
+        def right(event):
+            self.left += 8
+
+        @kb.add("h")
+        @kb.add("left")
+        def left(event):
+            self.left = max(self.left - 8, 0)
+
+        @kb.add("n")
+        def next_match(event):
+            self.search()
+
+        return kb
+
+    def status(self) -> str:
+        total = f"{self.index.line_count}{'' if self.index.complete else '+'}"
+        status = f" {self.index.path.name}  {self.top + 1}/{total} "
+        return f"{status} {self.message} " if self.message else status
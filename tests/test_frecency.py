@@ -0,0 +1,70 @@
+"""Define test suite for pynote.frecency"""
+
+from ..src.libs.apis import DirectoryList
+from ..src.libs.frecency import Frecency
+
+DAY = 24 * 60 * 60
+
+
+def test_score_decay(tmp_path):
+    h = Frecency(tmp_path / "history.log", half_life=DAY)
+    note = tmp_path / "a.wiki"
+    h.record(note, when=0.0)
+    assert h.score(note, now=0.0) == 1.0
+    assert abs(h.score(note, now=DAY) - 0.5) < 1e-9
+    h.record(note, when=DAY)
+    assert abs(h.score(note, now=DAY) - 1.5) < 1e-9
+    assert h.score(tmp_path / "missing.wiki") == 0.0
+
+
+def test_ranking_and_reload(tmp_path):
+    h = Frecency(tmp_path / "history.log", half_life=DAY)
+    old, new = tmp_path / "old.wiki", tmp_path / "new.wiki"
+    for when in (0.0, 1.0, 2.0):
+        h.record(old, when=when)
+    h.record(new, when=3 * DAY)
+    assert [p.name for p, _ in h.ranked(now=3 * DAY)] == ["new.wiki", "old.wiki"]
+    reloaded = Frecency(tmp_path / "history.log", half_life=DAY)
+    assert abs(reloaded.score(old, now=DAY) - h.score(old, now=DAY)) < 1e-9
+
+
+def test_compact(tmp_path):
+    log = tmp_path / "history.log"
+    h = Frecency(log, half_life=DAY)
+    note = tmp_path / "a.wiki"
+    for when in range(100):
+        h.record(note, when=float(when))
+    assert len(log.read_text().splitlines()) < 100
+    before = h.score(note, now=100.0)
+    h.compact(now=100.0)
+    assert len(log.read_text().splitlines()) == 1
+    assert abs(Frecency(log, half_life=DAY).score(note, now=100.0) - before) < 1e-9
+    h.record(tmp_path / "b.wiki", when=0.0)
+    h.compact(now=100 * DAY)
+    assert h.entries == {}
+
+
+def test_directory_list_ranked(tmp_path):
+    notes = tmp_path / "notes"
+    (notes / "sub").mkdir(parents=True)
+    for name in ("a.wiki", "b.wiki", "sub/c.wiki"):
+        (notes / name).write_text(name)
+    h = Frecency(tmp_path / "history.log")
+    h.record(notes / "sub" / "c.wiki")
+    h.record(tmp_path / "elsewhere.wiki")
+    dir_list = DirectoryList(str(notes), history=h)
+    ranked = list(dir_list.ranked_list())
+    assert ranked[0] == "notes/sub/c.wiki"
+    assert sorted(ranked) == sorted(dir_list.get_list())
+    assert dir_list.entry_path(ranked[0]) == (notes / "sub" / "c.wiki").resolve()
+
+
+def test_compact_keeps_other_processes_opens(tmp_path):
+    log = tmp_path / "history.log"
+    tui = Frecency(log, half_life=DAY)
+    tui.record(tmp_path / "a.wiki", when=0.0)
+    other = Frecency(log, half_life=DAY)
+    other.record(tmp_path / "b.wiki", when=1.0)
+    tui.compact(now=2.0)
+    assert Frecency(log, half_life=DAY).score(tmp_path / "b.wiki", now=1.0) == 1.0
+    assert tui.score(tmp_path / "b.wiki", now=1.0) == 1.0
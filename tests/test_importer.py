@@ -0,0 +1,107 @@
+"""Define test suite for pynote.importer"""
+
+import os
+from datetime import datetime
+
+from ..src.libs.importer import Importer, markdown_to_vimwiki, note_name
+
+
+def test_markdown_to_vimwiki():
+    md = "\n".join(
+        [
+            "## Section",
+            "Some **bold**, *italic* and `**code**`.",
+            "- [ ] todo",
+            "- [x] done",
+            "+ item",
+            "[site](https://example.com)",
+            "```python",
+            "# not a heading",
+            "```",
+            "---",
+        ]
+    )
+    assert markdown_to_vimwiki(md).splitlines() == [
+        "== Section ==",
+        "Some *bold*, _italic_ and `**code**`.",
+        "* [ ] todo",
+        "* [X] done",
+        "* item",
+        "[[https://example.com|site]]",
+        "{{{python",
+        "# not a heading",
+        "}}}",
+        "----",
+    ]
+
+
+def test_note_name():
+    assert note_name(datetime(2024, 1, 2, 3, 4), "a/b") == "202401020304-a-b.wiki"
+
+
+def test_import(tmp_path):
+    src, dest, state = tmp_path / "src", tmp_path / "notes", tmp_path / "state"
+    (src / "sub").mkdir(parents=True)
+    (src / "one.md").write_text("# Same\n\nSee [two](sub/two.md#top).\n")
+    (src / "sub" / "two.md").write_text("# Same\n\nBack to [one](../one.md).\n")
+    (src / "plain.txt").write_text("just text")
+    stamp = datetime(2024, 1, 2, 3, 4).timestamp()
+    for path in (src / "one.md", src / "sub" / "two.md", src / "plain.txt"):
+        os.utime(path, (stamp, stamp))
+
+    reports = []
+    status = Importer(src, dest, state, workers=2, batch_size=1).run(reports.append)
+    assert status.written == 3 and len(reports) == 3
+    assert reports[-1].done == reports[-1].total == 3
+
+    names = sorted(p.name for p in dest.iterdir())
+    assert names == [
+        "202401020304-Same-2.wiki",
+        "202401020304-Same.wiki",
+        "202401020304-plain.wiki",
+    ]
+    one = (dest / "202401020304-Same.wiki").read_text()
+    assert one.startswith("= Same =\n*Created:* 2024-01-02 03:04\n")
+    assert "[[202401020304-Same-2#top|two]]" in one
+    assert "[[202401020304-Same|one]]" in (dest / "202401020304-Same-2.wiki").read_text()
+    assert (dest / "202401020304-plain.wiki").stat().st_mtime == stamp
+
+    (src / "three.md").write_text("three")
+    again = Importer(src, dest, state, workers=1).run()
+    assert again.written == 1 and again.total == 4
+
+
+def test_import_retries_failed_notes(tmp_path):
+    src, dest, state = tmp_path / "src", tmp_path / "notes", tmp_path / "state"
+    src.mkdir()
+    (src / "good.md").write_text("good")
+    (src / "bad.md").write_text("bad")
+    importer = Importer(src, dest, state, workers=1)
+    blocked = dest / importer.load_plan()[str(src.resolve() / "bad.md")][0]
+    blocked.mkdir(parents=True)
+
+    status = importer.run()
+    assert status.written == 1 and status.done == 2
+    assert [os.path.basename(s) for s, _ in status.errors] == ["bad.md"]
+    assert "bad.md" in importer.failed_file.read_text()
+
+    blocked.rmdir()
+    again = Importer(src, dest, state, workers=1).run()
+    assert again.written == 1 and again.errors == [] and again.done == 2
+    assert blocked.is_file()
+    assert importer.failed_file.read_text() == ""
+
+
+def test_long_titles_fit_name_max(tmp_path):
+    created = datetime(2024, 1, 2, 3, 4)
+    title = "\u00e9" * 300
+    name = note_name(created, title, 12)
+    assert len(name.encode("utf-8")) <= 255 and name.endswith("-12.wiki")
+    assert note_name(created, title) != note_name(created, title, 2)
+
+    src, dest = tmp_path / "src", tmp_path / "notes"
+    src.mkdir()
+    (src / "a.md").write_text(f"# {'x' * 300}\n\nbody")
+    (src / "b.md").write_text(f"# {'x' * 300}\n\nbody")
+    status = Importer(src, dest, tmp_path / "state", workers=1).run()
+    assert status.written == 2 and status.errors == []
@@ -0,0 +1,102 @@
+"""Define test suite for pynote.apis.Notebooks"""
+
+import threading
+import time
+from pathlib import Path
+
+from ..src.libs.apis import FzF, Notebook, Notebooks
+from ..src.libs.frecency import Frecency
+
+
+def make_notebook(root: Path, *names: str) -> Path:
+    root.mkdir(parents=True)
+    for name in names:
+        root.joinpath(name).write_text(name)
+    return root
+
+
+def test_notebook_path(tmp_path):
+    root = make_notebook(tmp_path / "work", "a.wiki")
+    notebook = Notebook(root)
+    assert notebook.name == "work"
+    assert notebook.dir_list.get_list() == ["work/a.wiki"]
+
+
+def test_stream_merges_and_tags(tmp_path):
+    work = make_notebook(tmp_path / "work", "a.wiki")
+    home = make_notebook(tmp_path / "home", "b.wiki", "c.wiki")
+    notes = Notebooks.from_dirs({"w": str(work), "h": str(home)})
+    lines = sorted(notes.stream())
+    assert [line.split("\t")[1] for line in lines] == [
+        "[h] home/b.wiki",
+        "[h] home/c.wiki",
+        "[w] work/a.wiki",
+    ]
+    assert notes.entry_path(lines[0]) == (home / "b.wiki").resolve()
+
+
+def test_slow_notebook_does_not_block(tmp_path):
+    fast = Notebook(make_notebook(tmp_path / "fast", "a.wiki"))
+    slow = Notebook(make_notebook(tmp_path / "slow", "b.wiki"))
+    release = threading.Event()
+    iter_list = slow.dir_list.iter_list
+
+    def stalled():
+        release.wait(5)
+        yield from iter_list()
+
+    slow.dir_list.iter_list = stalled
+    stream = Notebooks([slow, fast]).stream()
+    assert next(stream).endswith("[fast] fast/a.wiki")
+    release.set()
+    assert next(stream).endswith("[slow] slow/b.wiki")
+    assert list(stream) == []
+
+
+def test_picker_returns_while_notebook_stalled(tmp_path):
+    fast = Notebook(make_notebook(tmp_path / "fast", "a.wiki"))
+    slow = Notebook(make_notebook(tmp_path / "slow", "b.wiki"))
+    release = threading.Event()
+
+    def stalled():
+        release.wait(30)
+        yield from ()
+
+    slow.dir_list.iter_list = stalled
+    start = time.monotonic()
+    selection = FzF("head -n1").prompt(Notebooks([slow, fast]).stream())
+    release.set()
+    assert time.monotonic() - start < 5
+    assert selection[0].endswith("[fast] fast/a.wiki")
+
+
+def test_frecent_entries_first_across_notebooks(tmp_path):
+    fast = make_notebook(tmp_path / "fast", "a.wiki", "b.wiki")
+    slow = make_notebook(tmp_path / "slow", "c.wiki")
+    history = Frecency(tmp_path / "history.log")
+    history.record(slow / "c.wiki", when=time.time() - 60)
+    history.record(fast / "b.wiki")
+    notes = Notebooks.from_dirs({"f": str(fast), "s": str(slow)}, history)
+    lines = [line.split("\t")[1] for line in notes.stream()]
+    assert lines[:2] == ["[f] fast/b.wiki", "[s] slow/c.wiki"]
+    assert sorted(lines[2:]) == ["[f] fast/a.wiki"]
+
+
+def test_frecent_entries_through_symlinked_root(tmp_path):
+    real = make_notebook(tmp_path / "disk" / "wiki", "a.wiki", "b.wiki")
+    (tmp_path / "wiki").symlink_to(real)
+    history = Frecency(tmp_path / "history.log")
+    history.record(tmp_path / "wiki" / "b.wiki")
+    notes = Notebooks.from_dirs({"w": str(tmp_path / "wiki")}, history)
+    lines = list(notes.stream())
+    assert lines[0].split("\t")[1] == "[w] wiki/b.wiki"
+    assert len(lines) == 2
+
+
+def test_deleted_frecent_note_is_dropped(tmp_path):
+    real = make_notebook(tmp_path / "real", "a.wiki", "gone.wiki")
+    history = Frecency(tmp_path / "history.log")
+    history.record(real / "gone.wiki")
+    (real / "gone.wiki").unlink()
+    notes = Notebooks.from_dirs({"r": str(real)}, history)
+    assert [line.split("\t")[1] for line in notes.stream()] == ["[r] real/a.wiki"]
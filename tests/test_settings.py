@@ -40,3 +40,10 @@ def test_settings():
     assert editor == "nvim"
     assert wiki_dir == "~/wiki"
     assert notebook_dir == "~/wiki/notes"
+
+
+def test_notebooks_default_to_notebook_dir():
+    s = Settings(test_dir)
+    assert "notebooks" not in s.default()
+    s.settings = {**s.default(), "notebook_dir": "~/elsewhere/notes"}
+    assert s.notebooks() == {"notes": "~/elsewhere/notes"}
@@ -0,0 +1,186 @@
+"""Define test suite for pynote.snapshot"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from ..src.libs import snapshot as snapshot_module
+from ..src.libs.snapshot import META_NAME, Snapshot, applied_snapshot, apply_snapshots
+
+
+def test_incremental_snapshots(tmp_path):
+    wiki, backups, restored = tmp_path / "wiki", tmp_path / "backups", tmp_path / "copy"
+    (wiki / "notes").mkdir(parents=True)
+    (wiki / "index.wiki").write_text("index")
+    (wiki / "notes" / "a.wiki").write_text("a")
+    (wiki / "notes" / "b.wiki").write_text("b")
+    snapshot = Snapshot(wiki, backups)
+
+    full = snapshot.run()
+    assert sorted(full.changed) == ["index.wiki", "notes/a.wiki", "notes/b.wiki"]
+    assert full.archive.exists()
+
+    unchanged = Snapshot(wiki, backups).run()
+    assert unchanged.archive is None and unchanged.hashed == 0
+
+    os.utime(wiki / "index.wiki", ns=(0, 0))
+    touched = Snapshot(wiki, backups).run()
+    assert touched.archive is None and touched.hashed == 1
+
+    (wiki / "notes" / "a.wiki").write_text("changed")
+    (wiki / "notes" / "b.wiki").unlink()
+    (wiki / "notes" / "c.wiki").write_text("c")
+    delta = Snapshot(wiki, backups).run()
+    assert sorted(delta.changed) == ["notes/a.wiki", "notes/c.wiki"]
+    assert delta.deleted == ["notes/b.wiki"]
+
+    assert len(apply_snapshots([full.archive, delta.archive], restored)) == 2
+    assert sorted(p.name for p in (restored / "notes").iterdir()) == [
+        "a.wiki",
+        "c.wiki",
+    ]
+    assert (restored / "notes" / "a.wiki").read_text() == "changed"
+
+    with pytest.raises(ValueError):
+        apply_snapshots([delta.archive, full.archive], tmp_path / "bad")
+
+
+def test_dest_inside_source(tmp_path):
+    (tmp_path / "a.wiki").write_text("a")
+    result = Snapshot(tmp_path, tmp_path / ".snapshots").run()
+    assert result.changed == ["a.wiki"]
+    assert Snapshot(tmp_path, tmp_path / ".snapshots").run().archive is None
+
+
+def make_archive(path, meta, files=None):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in [(META_NAME, json.dumps(meta).encode())] + list(
+            (files or {}).items()
+        ):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_apply_tracks_target_state(tmp_path):
+    wiki, backups, copy = tmp_path / "wiki", tmp_path / "backups", tmp_path / "copy"
+    wiki.mkdir()
+    (wiki / "a.wiki").write_text("a")
+    full = Snapshot(wiki, backups).run().archive
+    (wiki / "a.wiki").write_text("changed")
+    first = Snapshot(wiki, backups).run().archive
+    (wiki / "b.wiki").write_text("b")
+    second = Snapshot(wiki, backups).run().archive
+
+    with pytest.raises(ValueError):
+        apply_snapshots([first], copy)
+    apply_snapshots([full], copy)
+    assert applied_snapshot(copy) is not None
+    with pytest.raises(ValueError):
+        apply_snapshots([second], copy)
+    apply_snapshots([first], copy)
+    apply_snapshots([second], copy)
+    assert (copy / "b.wiki").read_text() == "b"
+    resnapshot = Snapshot(copy, tmp_path / "copy-backups").run()
+    assert sorted(resnapshot.changed) == ["a.wiki", "b.wiki"]
+
+
+def test_apply_rejects_unsafe_metadata(tmp_path):
+    target, victim = tmp_path / "target", tmp_path / "victim"
+    victim.write_text("keep")
+    bad = [
+        {"id": "x", "base": None, "deleted": ["../victim"]},
+        {"id": "x", "base": None, "deleted": [str(victim)]},
+        {"id": "../x", "base": None, "deleted": []},
+        {"id": "x", "base": "../y", "deleted": []},
+    ]
+    for n, meta in enumerate(bad):
+        with pytest.raises(ValueError):
+            apply_snapshots([make_archive(tmp_path / f"{n}.tar.gz", meta)], target)
+    assert victim.read_text() == "keep"
+
+
+def test_archived_content_matches_manifest(tmp_path, monkeypatch):
+    wiki, backups = tmp_path / "wiki", tmp_path / "backups"
+    wiki.mkdir()
+    note = wiki / "a.wiki"
+    note.write_text("old")
+    hash_file = snapshot_module.hash_file
+
+    def save_during_hash(path, *args):
+        digest = hash_file(path, *args)
+        note.write_text("new!")
+        return digest
+
+    monkeypatch.setattr(snapshot_module, "hash_file", save_during_hash)
+    result = Snapshot(wiki, backups).run()
+    with tarfile.open(result.archive) as tar:
+        archived = tar.extractfile("a.wiki").read()
+    manifest = json.loads((backups / "manifest.json").read_text())
+    assert manifest["files"]["a.wiki"][2] == hashlib.sha256(archived).hexdigest()
+
+
+def test_note_shrinking_or_vanishing_mid_run(tmp_path, monkeypatch):
+    wiki, backups = tmp_path / "wiki", tmp_path / "backups"
+    wiki.mkdir()
+    (wiki / "keep.wiki").write_text("keep")
+    (wiki / "gone.wiki").write_text("gone")
+    Snapshot(wiki, backups).run()
+    (wiki / "keep.wiki").write_text("a much longer note than before")
+    (wiki / "gone.wiki").write_text("edited")
+    hash_file = snapshot_module.hash_file
+
+    def edit_during_hash(path, *args):
+        digest = hash_file(path, *args)
+        if path.endswith("keep.wiki"):
+            (wiki / "keep.wiki").write_text("short")
+            (wiki / "gone.wiki").unlink()
+        return digest
+
+    monkeypatch.setattr(snapshot_module, "hash_file", edit_during_hash)
+    result = Snapshot(wiki, backups).run()
+    assert result.changed == ["keep.wiki"] and result.deleted == ["gone.wiki"]
+    with tarfile.open(result.archive) as tar:
+        assert tar.extractfile("keep.wiki").read() == b"short"
+        meta = json.load(tar.extractfile(META_NAME))
+    assert meta["deleted"] == ["gone.wiki"]
+    manifest = json.loads((backups / "manifest.json").read_text())["files"]
+    assert manifest["keep.wiki"][2] == hashlib.sha256(b"short").hexdigest()
+    assert "gone.wiki" not in manifest
+    assert not list(backups.glob("*.tmp"))
+
+
+def test_failed_archive_leaves_no_tmp(tmp_path, monkeypatch):
+    wiki, backups = tmp_path / "wiki", tmp_path / "backups"
+    wiki.mkdir()
+    (wiki / "a.wiki").write_text("a")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tarfile.TarFile, "addfile", fail)
+    with pytest.raises(OSError):
+        Snapshot(wiki, backups).run()
+    assert not list(backups.glob("snapshot-*"))
+
+
+def test_note_vanishing_before_hashing(tmp_path, monkeypatch):
+    wiki, backups = tmp_path / "wiki", tmp_path / "backups"
+    wiki.mkdir()
+    (wiki / "a.wiki").write_text("a")
+    Snapshot(wiki, backups).run()
+    (wiki / "a.wiki").write_text("edited")
+    hash_file = snapshot_module.hash_file
+
+    def vanish(path, *args):
+        os.unlink(path)
+        return hash_file(path, *args)
+
+    monkeypatch.setattr(snapshot_module, "hash_file", vanish)
+    result = Snapshot(wiki, backups).run()
+    assert result.changed == [] and result.deleted == ["a.wiki"]
@@ -0,0 +1,113 @@
+"""Define test suite for pynote.viewer"""
+
+import re
+import threading
+
+from ..src.libs.viewer import LineIndex, MappedFileControl
+
+
+def found(control, text=None):
+    thread = control.search(text)
+    if thread is not None:
+        thread.join()
+    return control.match
+
+
+def write_lines(path, count):
+    path.write_text("".join(f"line {i}\n" for i in range(count)))
+    return path
+
+
+def test_line_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(LineIndex, "chunk_size", 64)
+    index = LineIndex(write_lines(tmp_path / "big.log", 5000))
+    assert index.lines(0, 2) == ["line 0", "line 1"]
+    assert index.lines(4321, 1) == ["line 4321"]
+    assert index.lines(4999, 5) == ["line 4999"]
+    assert index.lines(5000, 1) == []
+    assert index.line_at(index.offset(1234) + 3) == 1234
+    assert index.search(re.compile(rb"line 4242\n")) == 4242
+    assert index.search(re.compile(rb"line 10\n"), 4000) == 10
+    assert index.search(re.compile(rb"missing")) is None
+    index._builder.join()
+    assert index.complete and index.line_count == 5000
+    index.close()
+
+
+def test_line_index_edges(tmp_path):
+    (tmp_path / "empty.log").touch()
+    empty = LineIndex(tmp_path / "empty.log")
+    assert empty.lines(0, 10) == []
+    empty._builder.join()
+    assert empty.line_count == 0
+    empty.close()
+    (tmp_path / "tail.log").write_bytes(b"a\r\nb")
+    tail = LineIndex(tmp_path / "tail.log")
+    assert tail.lines(0, 10) == ["a", "b"]
+    tail._builder.join()
+    assert tail.line_count == 2
+    tail.close()
+
+
+def test_control_window(tmp_path):
+    control = MappedFileControl(write_lines(tmp_path / "big.log", 1000))
+    control.index._builder.join()
+    content = control.create_content(width=5, height=3)
+    assert content.line_count == 3
+    assert content.get_line(0) == [("", "line ")]
+    control.goto(10_000)
+    assert control.top == 997
+    control.goto(0)
+    assert found(control, "LINE 500") == 500
+    assert control.top == 500
+    assert found(control) == 500
+    control.index.close()
+
+
+def test_control_regex_search(tmp_path):
+    control = MappedFileControl(write_lines(tmp_path / "big.log", 100))
+    assert found(control, r"LINE 4\d\n") == 40
+    assert control.search("line (") is None
+    assert control.message.startswith("Invalid pattern")
+    assert "Invalid pattern" in control.status()
+    assert found(control, "nope") is None and control.message == "Pattern not found"
+    control.index.close()
+
+
+def test_wrapped_search_spans_start(tmp_path):
+    (tmp_path / "two.log").write_text("alpha\nbeta\n")
+    index = LineIndex(tmp_path / "two.log")
+    assert index.search(re.compile(rb"alpha\nbe"), 1) == 0
+    index.close()
+
+
+def test_search_anchors_match_lines(tmp_path):
+    (tmp_path / "app.log").write_text("INFO x\nERROR y\nINFO z\n")
+    control = MappedFileControl(tmp_path / "app.log")
+    assert found(control, "^error") == 1
+    control.match = None
+    assert found(control, "z$") == 2
+    control.index.close()
+
+
+def test_search_runs_off_the_caller_thread(tmp_path):
+    updates = threading.Event()
+    control = MappedFileControl(
+        write_lines(tmp_path / "big.log", 1000), on_progress=updates.set
+    )
+    control.index._builder.join()
+    updates.clear()
+    release = threading.Event()
+    index_search = control.index.search
+
+    def blocked(*args):
+        release.wait(5)
+        return index_search(*args)
+
+    control.index.search = blocked
+    thread = control.search("line 999$")
+    assert control.message == "searching…" and not updates.is_set()
+    release.set()
+    thread.join()
+    assert updates.is_set() and control.match == 999 and control.message == ""
+    control.index.close()